@@ -1,24 +1,30 @@
 import os
-import random
-import string
-from datetime import datetime, timedelta, date
+import secrets
+from datetime import datetime, timedelta, date, timezone
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException
+import msgspec
+import numpy as np
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from schemas import (
-    League,
-    Team,
-    Player,
-    Member,
-    Match,
+    REQUEST_MODEL_CONFIG,
     CreateLeagueRequest,
     JoinLeagueRequest,
 )
 
-app = FastAPI(title="JustPlay League Manager API")
+class MsgspecJSONResponse(JSONResponse):
+    """JSONResponse that encodes msgspec Structs (and plain containers of
+    them) directly, skipping jsonable_encoder + the Pydantic dump path."""
+
+    def render(self, content) -> bytes:
+        return msgspec.json.encode(content)
+
+
+app = FastAPI(title="JustPlay League Manager API", default_response_class=MsgspecJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,28 +38,58 @@ app.add_middleware(
 # ---------------------------------------------------------------------------
 # Mock Data Store (in-memory for this prototype)
 # ---------------------------------------------------------------------------
-MOCK_LEAGUES: dict[str, League] = {}
-MOCK_MATCHES: dict[str, List[Match]] = {}
+# Canonical state lives in plain dicts/lists shaped like the Structs in
+# schemas.py, so writes mutate raw containers and reads hand the stored
+# dict straight to msgspec for encoding — no model construction on the
+# hot path. A league dict nests its "teams" (each with "players"),
+# "members" and "organizer"; MATCHES holds each league's ordered match
+# dicts.
+LEAGUES: dict[str, dict] = {}
+MATCHES: dict[str, List[dict]] = {}
+
+# Secondary indexes so per-id lookups are O(1) instead of scanning the
+# team/match lists. Values are the same dicts stored above.
+TEAMS_BY_ID: dict[str, dict[str, dict]] = {}
+MATCHES_BY_ID: dict[str, dict[str, dict]] = {}
+CODE_TO_LEAGUE_ID: dict[str, str] = {}
+
+# Structure-of-arrays view of each league's matches, rebuilt on
+# generate_schedule and patched in update_result. team_ids snapshots the
+# team order at schedule time; scores hold -1 until a result is recorded.
+MATCH_ARRAYS: dict[str, dict] = {}
+
+# Standings cache: LEAGUE_VERSION is bumped on any write that can change
+# the table; standings reuses its last result while the version matches.
+LEAGUE_VERSION: dict[str, int] = {}
+STANDINGS_CACHE: dict[str, tuple[int, List["Standing"]]] = {}
 
 
 def _gen_id(prefix: str) -> str:
-    return f"{prefix}_" + "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    return f"{prefix}_{secrets.token_hex(4)}"
 
 
 def _gen_code() -> str:
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    return secrets.token_hex(3).upper()
+
+
+def get_league_or_404(league_id: str) -> dict:
+    """Dependency resolving the league_id path param to a stored league."""
+    league = LEAGUES.get(league_id)
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
+    return league
 
 
 # ---------------------------------------------------------------------------
 # Health & Schema
 # ---------------------------------------------------------------------------
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "JustPlay League Manager Backend is running"}
 
 
 @app.get("/schema")
-def get_schema_overview():
+async def get_schema_overview():
     return {
         "models": ["League", "Team", "Player", "Member", "Match"],
         "version": 1,
@@ -63,53 +99,56 @@ def get_schema_overview():
 # ---------------------------------------------------------------------------
 # League APIs
 # ---------------------------------------------------------------------------
-@app.post("/api/leagues", response_model=League)
-def create_league(payload: CreateLeagueRequest):
+@app.post("/api/leagues")
+async def create_league(payload: CreateLeagueRequest):
     league_id = _gen_id("league")
     code = _gen_code()
 
-    organizer = Member(
-        id=_gen_id("user"),
-        name=payload.organizer_name,
-        role="organizer",
-        joined_at=datetime.utcnow(),
-    )
+    organizer = {
+        "id": _gen_id("user"),
+        "name": payload.organizer_name,
+        "role": "organizer",
+        "joined_at": datetime.now(timezone.utc),
+    }
 
-    league = League(
-        id=league_id,
-        code=code,
-        name=payload.name,
-        description=payload.description,
-        sport=payload.sport,
-        location=payload.location,
-        start_date=payload.start_date,
-        avatar=payload.avatar,
-        allow_free_join=payload.allow_free_join,
-        number_of_teams=payload.number_of_teams,
-        organizer=organizer,
-        teams=[],
-        members=[organizer],
-    )
+    league = {
+        "id": league_id,
+        "code": code,
+        "name": payload.name,
+        "description": payload.description,
+        "sport": payload.sport,
+        "location": payload.location,
+        "start_date": payload.start_date,
+        "avatar": payload.avatar,
+        "allow_free_join": payload.allow_free_join,
+        "number_of_teams": payload.number_of_teams,
+        "organizer": organizer,
+        "teams": [],
+        "members": [organizer],
+    }
 
-    MOCK_LEAGUES[league_id] = league
-    MOCK_MATCHES[league_id] = []
-    return league
+    LEAGUES[league_id] = league
+    MATCHES[league_id] = []
+    TEAMS_BY_ID[league_id] = {}
+    MATCHES_BY_ID[league_id] = {}
+    CODE_TO_LEAGUE_ID[code] = league_id
+    LEAGUE_VERSION[league_id] = 0
+    return MsgspecJSONResponse(league)
 
 
-@app.get("/api/leagues", response_model=List[League])
-def list_leagues():
-    return list(MOCK_LEAGUES.values())
+@app.get("/api/leagues")
+async def list_leagues():
+    return MsgspecJSONResponse(list(LEAGUES.values()))
 
 
-@app.get("/api/leagues/{league_id}", response_model=League)
-def get_league(league_id: str):
-    league = MOCK_LEAGUES.get(league_id)
-    if not league:
-        raise HTTPException(status_code=404, detail="League not found")
-    return league
+@app.get("/api/leagues/{league_id}")
+async def get_league(league: dict = Depends(get_league_or_404)):
+    return MsgspecJSONResponse(league)
 
 
 class UpdateLeagueRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     name: Optional[str] = None
     description: Optional[str] = None
     location: Optional[str] = None
@@ -119,187 +158,199 @@ class UpdateLeagueRequest(BaseModel):
     number_of_teams: Optional[int] = None
 
 
-@app.patch("/api/leagues/{league_id}", response_model=League)
-def update_league(league_id: str, payload: UpdateLeagueRequest):
-    league = MOCK_LEAGUES.get(league_id)
-    if not league:
-        raise HTTPException(status_code=404, detail="League not found")
-
-    data = payload.model_dump(exclude_unset=True)
-    updated = league.model_copy(update=data)
-    MOCK_LEAGUES[league_id] = updated
-    return updated
+@app.patch("/api/leagues/{league_id}")
+async def update_league(payload: UpdateLeagueRequest, league: dict = Depends(get_league_or_404)):
+    league.update(payload.model_dump(exclude_unset=True))
+    return MsgspecJSONResponse(league)
 
 
 # ---------------------------------------------------------------------------
 # Membership
 # ---------------------------------------------------------------------------
-@app.post("/api/leagues/{league_id}/join", response_model=League)
-def join_league(league_id: str, payload: JoinLeagueRequest):
-    league = MOCK_LEAGUES.get(league_id)
-    if not league:
-        raise HTTPException(status_code=404, detail="League not found")
+def _new_member(name: str) -> dict:
+    return {
+        "id": _gen_id("user"),
+        "name": name,
+        "role": "member",
+        "joined_at": datetime.now(timezone.utc),
+    }
+
 
-    member = Member(id=_gen_id("user"), name=payload.name, role="member", joined_at=datetime.utcnow())
-    updated_members = list(league.members) + [member]
-    updated = league.model_copy(update={"members": updated_members})
-    MOCK_LEAGUES[league_id] = updated
-    return updated
+@app.post("/api/leagues/{league_id}/join")
+async def join_league(payload: JoinLeagueRequest, league: dict = Depends(get_league_or_404)):
+    league["members"].append(_new_member(payload.name))
+    return MsgspecJSONResponse(league)
 
 
-@app.post("/api/leagues/join/{code}", response_model=League)
-def join_league_by_code(code: str, payload: JoinLeagueRequest):
-    for league in MOCK_LEAGUES.values():
-        if league.code == code:
-            member = Member(id=_gen_id("user"), name=payload.name, role="member", joined_at=datetime.utcnow())
-            updated_members = list(league.members) + [member]
-            updated = league.model_copy(update={"members": updated_members})
-            MOCK_LEAGUES[league.id] = updated
-            return updated
-    raise HTTPException(status_code=404, detail="Invalid code")
+@app.post("/api/leagues/join/{code}")
+async def join_league_by_code(code: str, payload: JoinLeagueRequest):
+    league_id = CODE_TO_LEAGUE_ID.get(code)
+    if not league_id:
+        raise HTTPException(status_code=404, detail="Invalid code")
+
+    league = LEAGUES[league_id]
+    league["members"].append(_new_member(payload.name))
+    return MsgspecJSONResponse(league)
 
 
 # ---------------------------------------------------------------------------
 # Teams
 # ---------------------------------------------------------------------------
 class CreateTeamRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     name: str
     avatar: Optional[str] = None
 
 
-@app.post("/api/leagues/{league_id}/teams", response_model=League)
-def add_team(league_id: str, payload: CreateTeamRequest):
-    league = MOCK_LEAGUES.get(league_id)
-    if not league:
-        raise HTTPException(status_code=404, detail="League not found")
+@app.post("/api/leagues/{league_id}/teams")
+async def add_team(payload: CreateTeamRequest, league: dict = Depends(get_league_or_404)):
+    new_team = {"id": _gen_id("team"), "name": payload.name, "avatar": payload.avatar, "players": []}
+    league["teams"].append(new_team)
+    TEAMS_BY_ID[league["id"]][new_team["id"]] = new_team
+    LEAGUE_VERSION[league["id"]] += 1
+    return MsgspecJSONResponse(league)
 
-    new_team = Team(id=_gen_id("team"), name=payload.name, avatar=payload.avatar, players=[])
-    updated_teams = list(league.teams) + [new_team]
-    updated = league.model_copy(update={"teams": updated_teams})
-    MOCK_LEAGUES[league_id] = updated
-    return updated
 
-
-@app.delete("/api/leagues/{league_id}/teams/{team_id}", response_model=League)
-def remove_team(league_id: str, team_id: str):
-    league = MOCK_LEAGUES.get(league_id)
-    if not league:
-        raise HTTPException(status_code=404, detail="League not found")
-
-    updated_teams = [t for t in league.teams if t.id != team_id]
-    updated = league.model_copy(update={"teams": updated_teams})
-    MOCK_LEAGUES[league_id] = updated
-    return updated
+@app.delete("/api/leagues/{league_id}/teams/{team_id}")
+async def remove_team(team_id: str, league: dict = Depends(get_league_or_404)):
+    league["teams"][:] = [t for t in league["teams"] if t["id"] != team_id]
+    TEAMS_BY_ID[league["id"]].pop(team_id, None)
+    LEAGUE_VERSION[league["id"]] += 1
+    return MsgspecJSONResponse(league)
 
 
 class AddPlayerRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     team_id: str
     name: str
     avatar: Optional[str] = None
     position: Optional[str] = None
 
 
-@app.post("/api/leagues/{league_id}/players", response_model=League)
-def add_player(league_id: str, payload: AddPlayerRequest):
-    league = MOCK_LEAGUES.get(league_id)
-    if not league:
-        raise HTTPException(status_code=404, detail="League not found")
+@app.post("/api/leagues/{league_id}/players")
+async def add_player(payload: AddPlayerRequest, league: dict = Depends(get_league_or_404)):
+    player = {"id": _gen_id("player"), "name": payload.name, "avatar": payload.avatar, "position": payload.position}
 
-    player = Player(id=_gen_id("player"), name=payload.name, avatar=payload.avatar, position=payload.position)
-
-    teams = []
-    for t in league.teams:
-        if t.id == payload.team_id:
-            teams.append(t.model_copy(update={"players": list(t.players) + [player]}))
-        else:
-            teams.append(t)
+    team = TEAMS_BY_ID[league["id"]].get(payload.team_id)
+    if team:
+        team["players"].append(player)
+        LEAGUE_VERSION[league["id"]] += 1
 
-    updated = league.model_copy(update={"teams": teams})
-    MOCK_LEAGUES[league_id] = updated
-    return updated
+    return MsgspecJSONResponse(league)
 
 
 # ---------------------------------------------------------------------------
 # Scheduling & Results
 # ---------------------------------------------------------------------------
 class GenerateScheduleRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     rounds: int = 1
     start_at: Optional[datetime] = None
     days_between: int = 7
 
 
-@app.post("/api/leagues/{league_id}/schedule", response_model=List[Match])
-def generate_schedule(league_id: str, payload: GenerateScheduleRequest):
-    league = MOCK_LEAGUES.get(league_id)
-    if not league:
-        raise HTTPException(status_code=404, detail="League not found")
-
-    teams = league.teams
-    if len(teams) < 2:
+@app.post("/api/leagues/{league_id}/schedule")
+async def generate_schedule(payload: GenerateScheduleRequest, league: dict = Depends(get_league_or_404)):
+    league_id = league["id"]
+    teams = league["teams"]
+    n = len(teams)
+    if n < 2:
         raise HTTPException(status_code=400, detail="Need at least 2 teams to schedule matches")
 
-    start_time = payload.start_at or datetime.utcnow() + timedelta(days=1)
+    start_time = payload.start_at or datetime.now(timezone.utc) + timedelta(days=1)
+    delta = timedelta(days=payload.days_between)
 
-    matches: List[Match] = []
+    # Circle method: fix the first slot and rotate the rest each round so
+    # every team meets a different opponent per round. An odd team count
+    # gets a bye slot (None) whose pairing is skipped.
+    slots: List[Optional[dict]] = list(teams)
+    if n % 2:
+        slots.append(None)
+    half = len(slots) // 2
+
+    matches_per_round = n // 2
+    matches: List[dict] = [None] * (payload.rounds * matches_per_round)
+    idx = 0
     when = start_time
     for r in range(1, payload.rounds + 1):
-        for i in range(0, len(teams), 2):
-            if i + 1 < len(teams):
-                home = teams[i]
-                away = teams[i + 1]
-                matches.append(
-                    Match(
-                        id=_gen_id("match"),
-                        league_id=league_id,
-                        round=r,
-                        home_team_id=home.id,
-                        away_team_id=away.id,
-                        court=None,
-                        scheduled_at=when,
-                    )
-                )
-                when = when + timedelta(days=payload.days_between)
+        for i in range(half):
+            home = slots[i]
+            away = slots[-1 - i]
+            if home is None or away is None:
+                continue
+            matches[idx] = {
+                "id": _gen_id("match"),
+                "league_id": league_id,
+                "round": r,
+                "home_team_id": home["id"],
+                "away_team_id": away["id"],
+                "court": None,
+                "scheduled_at": when,
+                "scheduled_at_epoch": int(when.timestamp()),
+                "home_score": None,
+                "away_score": None,
+            }
+            idx += 1
+        slots.insert(1, slots.pop())
+        when = when + delta
+
+    MATCHES[league_id] = matches
+    MATCHES_BY_ID[league_id] = {m["id"]: m for m in matches}
+
+    total = len(matches)
+    team_idx = {t["id"]: i for i, t in enumerate(teams)}
+    MATCH_ARRAYS[league_id] = {
+        "team_ids": [t["id"] for t in teams],
+        "match_pos": {m["id"]: i for i, m in enumerate(matches)},
+        "home_idx": np.fromiter((team_idx[m["home_team_id"]] for m in matches), dtype=np.int32, count=total),
+        "away_idx": np.fromiter((team_idx[m["away_team_id"]] for m in matches), dtype=np.int32, count=total),
+        "home_score": np.full(total, -1, dtype=np.int32),
+        "away_score": np.full(total, -1, dtype=np.int32),
+        "scheduled_at_epoch": np.fromiter((m["scheduled_at_epoch"] for m in matches), dtype=np.int64, count=total),
+    }
 
-    MOCK_MATCHES[league_id] = matches
-    return matches
+    LEAGUE_VERSION[league_id] += 1
+    return MsgspecJSONResponse(matches)
 
 
-@app.get("/api/leagues/{league_id}/schedule", response_model=List[Match])
-def get_schedule(league_id: str):
-    return MOCK_MATCHES.get(league_id, [])
+@app.get("/api/leagues/{league_id}/schedule")
+async def get_schedule(league_id: str):
+    return MsgspecJSONResponse(MATCHES.get(league_id, []))
 
 
 class UpdateResultRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     match_id: str
     home_score: int
     away_score: int
 
 
-@app.post("/api/leagues/{league_id}/results", response_model=List[Match])
-def update_result(league_id: str, payload: UpdateResultRequest):
-    matches = MOCK_MATCHES.get(league_id, [])
-    found = False
-    updated_list: List[Match] = []
-    for m in matches:
-        if m.id == payload.match_id:
-            updated_list.append(
-                m.model_copy(update={"home_score": payload.home_score, "away_score": payload.away_score})
-            )
-            found = True
-        else:
-            updated_list.append(m)
-
-    if not found:
+@app.post("/api/leagues/{league_id}/results")
+async def update_result(league_id: str, payload: UpdateResultRequest):
+    m = MATCHES_BY_ID.get(league_id, {}).get(payload.match_id)
+    if not m:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    MOCK_MATCHES[league_id] = updated_list
-    return updated_list
+    m["home_score"] = payload.home_score
+    m["away_score"] = payload.away_score
+
+    arrays = MATCH_ARRAYS[league_id]
+    pos = arrays["match_pos"][m["id"]]
+    arrays["home_score"][pos] = payload.home_score
+    arrays["away_score"][pos] = payload.away_score
+
+    LEAGUE_VERSION[league_id] += 1
+    return MsgspecJSONResponse(MATCHES[league_id])
 
 
 # ---------------------------------------------------------------------------
 # Standings (computed)
 # ---------------------------------------------------------------------------
-class Standing(BaseModel):
+class Standing(msgspec.Struct):
     team_id: str
     team_name: str
     played: int
@@ -309,53 +360,72 @@ class Standing(BaseModel):
     points_against: int
 
 
-@app.get("/api/leagues/{league_id}/standings", response_model=List[Standing])
-def standings(league_id: str):
-    league = MOCK_LEAGUES.get(league_id)
-    if not league:
-        raise HTTPException(status_code=404, detail="League not found")
-
-    stats: dict[str, Standing] = {}
-    for t in league.teams:
-        stats[t.id] = Standing(
-            team_id=t.id,
-            team_name=t.name,
-            played=0,
-            wins=0,
-            losses=0,
-            points_for=0,
-            points_against=0,
-        )
-
-    for m in MOCK_MATCHES.get(league_id, []):
-        if m.home_score is None or m.away_score is None:
-            continue
-        h = stats[m.home_team_id]
-        a = stats[m.away_team_id]
-        h.played += 1
-        a.played += 1
-        h.points_for += m.home_score
-        h.points_against += m.away_score
-        a.points_for += m.away_score
-        a.points_against += m.home_score
-        if m.home_score > m.away_score:
-            h.wins += 1
-            a.losses += 1
-        elif m.away_score > m.home_score:
-            a.wins += 1
-            h.losses += 1
+@app.get("/api/leagues/{league_id}/standings")
+async def standings(league: dict = Depends(get_league_or_404)):
+    league_id = league["id"]
+    version = LEAGUE_VERSION.get(league_id, 0)
+    cached = STANDINGS_CACHE.get(league_id)
+    if cached and cached[0] == version:
+        return MsgspecJSONResponse(cached[1])
+
+    # Aggregate over the SoA match view with bincount — O(matches) in C.
+    # Slots follow the team snapshot taken at schedule time; teams added
+    # since (or leagues with no schedule yet) get all-zero rows.
+    teams = league["teams"]
+    arrays = MATCH_ARRAYS.get(league_id)
+    if arrays is not None and len(arrays["home_idx"]):
+        n = len(arrays["team_ids"])
+        mask = arrays["home_score"] >= 0
+        hi = arrays["home_idx"][mask]
+        ai = arrays["away_idx"][mask]
+        hs = arrays["home_score"][mask]
+        as_ = arrays["away_score"][mask]
+        played = np.bincount(hi, minlength=n) + np.bincount(ai, minlength=n)
+        pf = np.bincount(hi, weights=hs, minlength=n) + np.bincount(ai, weights=as_, minlength=n)
+        pa = np.bincount(hi, weights=as_, minlength=n) + np.bincount(ai, weights=hs, minlength=n)
+        home_won = hs > as_
+        away_won = as_ > hs
+        wins = np.bincount(hi[home_won], minlength=n) + np.bincount(ai[away_won], minlength=n)
+        losses = np.bincount(hi[away_won], minlength=n) + np.bincount(ai[home_won], minlength=n)
+        slot_of = {tid: i for i, tid in enumerate(arrays["team_ids"])}
+    else:
+        slot_of = {}
+
+    table = []
+    for t in teams:
+        i = slot_of.get(t["id"])
+        if i is None:
+            table.append(Standing(t["id"], t["name"], 0, 0, 0, 0, 0))
+        else:
+            table.append(
+                Standing(
+                    team_id=t["id"],
+                    team_name=t["name"],
+                    played=int(played[i]),
+                    wins=int(wins[i]),
+                    losses=int(losses[i]),
+                    points_for=int(pf[i]),
+                    points_against=int(pa[i]),
+                )
+            )
 
     # Sort: wins desc, point diff desc
-    table = sorted(
-        stats.values(),
-        key=lambda s: (s.wins, s.points_for - s.points_against),
-        reverse=True,
-    )
-    return table
+    table.sort(key=lambda s: (s.wins, s.points_for - s.points_against), reverse=True)
+    STANDINGS_CACHE[league_id] = (version, table)
+    return MsgspecJSONResponse(table)
 
 
 if __name__ == "__main__":
     import uvicorn
 
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # WEB_CONCURRENCY sets the uvicorn worker count. Keep it at 1 while the
+    # mock store lives in process memory — workers do not share state.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+    )
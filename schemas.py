@@ -1,80 +1,101 @@
 """
 Database Schemas for JustPlay League Manager
 
-Pydantic models below describe the core domain. Each class name maps to a
+Domain models below describe the core domain. Each class name maps to a
 collection name using its lowercase form if/when persistence is enabled.
 
 This initial release uses mocked data served by the API, but schemas are
 defined up-front so we can seamlessly switch to MongoDB persistence later.
+
+Domain models (League, Team, Player, Member, Match) are msgspec Structs
+documenting the canonical shape; the mock store in main.py keeps plain
+dicts mirroring these fields and hands them straight to msgspec for
+encoding. Request models stay Pydantic for validation and OpenAPI.
 """
 
-from pydantic import BaseModel, Field, HttpUrl
+import msgspec
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Literal
 from datetime import date, datetime
 
 SportType = Literal["basketball"]
 
+# Shared config for request models: inputs are trusted prototype payloads,
+# so skip the optional per-instance costs (assignment validation, extras
+# bookkeeping, string normalization).
+REQUEST_MODEL_CONFIG = ConfigDict(
+    extra="ignore",
+    validate_assignment=False,
+    str_strip_whitespace=False,
+)
+
 
-class Player(BaseModel):
-    id: str = Field(..., description="Unique player id")
+class Player(msgspec.Struct):
+    id: str
     name: str
-    avatar: Optional[HttpUrl] = None
+    avatar: Optional[str] = None
     position: Optional[str] = None
 
 
-class Team(BaseModel):
+class Team(msgspec.Struct):
     id: str
     name: str
-    avatar: Optional[HttpUrl] = None
+    avatar: Optional[str] = None
     players: List[Player] = []
 
 
-class Member(BaseModel):
+class Member(msgspec.Struct):
     id: str
     name: str
-    role: Literal["organizer", "member"] = "member"
     joined_at: datetime
+    role: Literal["organizer", "member"] = "member"
 
 
-class League(BaseModel):
+class League(msgspec.Struct):
     id: str
-    code: str = Field(..., description="Short code used to join league")
+    # Short code used to join league
+    code: str
     name: str
+    organizer: Member
     description: Optional[str] = None
     sport: SportType = "basketball"
     location: Optional[str] = None
     start_date: Optional[date] = None
-    avatar: Optional[HttpUrl] = None
+    avatar: Optional[str] = None
     allow_free_join: bool = True
     number_of_teams: Optional[int] = None
-    organizer: Member
     teams: List[Team] = []
     members: List[Member] = []
 
 
-class Match(BaseModel):
+class Match(msgspec.Struct):
     id: str
     league_id: str
     round: int
     home_team_id: str
     away_team_id: str
-    court: Optional[str] = None
     scheduled_at: datetime
+    scheduled_at_epoch: int
+    court: Optional[str] = None
     home_score: Optional[int] = None
     away_score: Optional[int] = None
 
 
 class CreateLeagueRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     name: str
     description: Optional[str] = None
     sport: SportType = "basketball"
     location: Optional[str] = None
     start_date: Optional[date] = None
-    avatar: Optional[HttpUrl] = None
+    avatar: Optional[str] = None
     number_of_teams: Optional[int] = None
     allow_free_join: bool = True
     organizer_name: str
 
 
 class JoinLeagueRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     name: str